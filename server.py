@@ -6,14 +6,17 @@ Wayback Machine. Fetch snapshots, search history, and retrieve archived content.
 """
 
 import asyncio
-import json
-from datetime import datetime
-from typing import Any
+import calendar
+import functools
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
 from urllib.parse import quote_plus
 
 import httpx
+import orjson
 from mcp.server import Server
-from mcp.server.stdio import stdio_server
 from mcp.types import (
     CallToolResult,
     TextContent,
@@ -23,150 +26,165 @@ from mcp.types import (
 # Initialize MCP server
 app = Server("wayback-machine-mcp")
 
-WAYBACK_AVAILABILITY_API = "http://archive.org/wayback/available"
-WAYBACK_CDY A_API = "https://web.archive.org/cdx/search/cdx"
+WAYBACK_AVAILABILITY_API = "https://archive.org/wayback/available"
+WAYBACK_CDX_API = "https://web.archive.org/cdx/search/cdx"
 WAYBACK_BASE_URL = "https://web.archive.org/web"
 
-
-@app.list_tools()
-async def list_tools() -> list[Tool]:
-    return [
-        Tool(
-            name="get_latest_snapshot",
-            description=(
-                "Get the most recent archived snapshot of a URL from the Wayback Machine. "
-                "Returns the snapshot URL, timestamp, and HTTP status."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "url": {
-                        "type": "string",
-                        "description": "The URL to look up in the Wayback Machine (e.g. 'example.com' or 'https://example.com/page')",
-                    }
-                },
-                "required": ["url"],
-            },
+# Shared HTTP client, created in main() so connections to archive.org are reused
+_CLIENT: httpx.AsyncClient | None = None
+
+# Cap on simultaneous upstream requests, to stay polite to archive.org
+MAX_CONCURRENT_REQUESTS = 8
+_RATE_LIMIT = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+# Cache lifetimes (seconds) for upstream lookups
+AVAILABILITY_TTL = 300
+CDX_TTL = 600
+NEGATIVE_TTL = 60
+
+# Limits for get_snapshot_content; MAX_BYTES covers MAX_CHARS of UTF-8 text
+MAX_CHARS = 50_000
+MAX_BYTES = 200_000
+
+# Matches the timestamp segment right after the host of a snapshot URL,
+# e.g. "https://web.archive.org/web/20230101120000/"
+_WEB_TS_RE = re.compile(r"^(https?://[^/]+/web/)(\d{1,14})/")
+
+# Tool definitions are static, so build them once at import time
+_TOOLS: list[Tool] = [
+    Tool(
+        name="get_latest_snapshot",
+        description=(
+            "Get the most recent archived snapshot of a URL from the Wayback Machine. "
+            "Returns the snapshot URL, timestamp, and HTTP status."
         ),
-        Tool(
-            name="get_snapshot_at_date",
-            description=(
-                "Get the closest archived snapshot of a URL to a specific date/time. "
-                "Returns the snapshot URL, timestamp, and HTTP status."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "url": {
-                        "type": "string",
-                        "description": "The URL to look up in the Wayback Machine",
-                    },
-                    "timestamp": {
-                        "type": "string",
-                        "description": (
-                            "The target date/time in YYYYMMDdhhmmss format (1-14 digits). "
-                            "Examples: '20230101' for Jan 1 2023, '20230101120000' for noon on Jan 1 2023."
-                        ),
-                    },
-                },
-                "required": ["url", "timestamp"],
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "url": {
+                    "type": "string",
+                    "description": "The URL to look up in the Wayback Machine (e.g. 'example.com' or 'https://example.com/page')",
+                }
             },
+            "required": ["url"],
+        },
+    ),
+    Tool(
+        name="get_snapshot_at_date",
+        description=(
+            "Get the closest archived snapshot of a URL to a specific date/time. "
+            "Returns the snapshot URL, timestamp, and HTTP status."
         ),
-        Tool(
-            name="search_snapshots",
-            description=(
-                "Search the Wayback Machine CDX index for all archived snapshots of a URL. "
-                "Returns a list of snapshots with timestamps, status codes, and MIME types. "
-                "Supports date range filtering and result limits."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "url": {
-                        "type": "string",
-                        "description": "The URL to search for (supports wildcards with '*', e.g. 'example.com/*')",
-                    },
-                    "from_date": {
-                        "type": "string",
-                        "description": "Start date filter in YYYYMMDD format (optional)",
-                    },
-                    "to_date": {
-                        "type": "string",
-                        "description": "End date filter in YYYYMMDD format (optional)",
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Maximum number of results to return (default: 10, max: 100)",
-                        "default": 10,
-                    },
-                    "status_code": {
-                        "type": "string",
-                        "description": "Filter by HTTP status code (e.g. '200', '404'). Optional.",
-                    },
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "url": {
+                    "type": "string",
+                    "description": "The URL to look up in the Wayback Machine",
+                },
+                "timestamp": {
+                    "type": "string",
+                    "description": (
+                        "The target date/time in YYYYMMDdhhmmss format (1-14 digits). "
+                        "Examples: '20230101' for Jan 1 2023, '20230101120000' for noon on Jan 1 2023."
+                    ),
                 },
-                "required": ["url"],
             },
+            "required": ["url", "timestamp"],
+        },
+    ),
+    Tool(
+        name="search_snapshots",
+        description=(
+            "Search the Wayback Machine CDX index for all archived snapshots of a URL. "
+            "Returns a list of snapshots with timestamps, status codes, and MIME types. "
+            "Supports date range filtering and result limits."
         ),
-        Tool(
-            name="get_snapshot_content",
-            description=(
-                "Fetch the raw content of a specific Wayback Machine snapshot. "
-                "Returns the page content as text. Use get_latest_snapshot or search_snapshots first to get a snapshot URL."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "snapshot_url": {
-                        "type": "string",
-                        "description": "The full Wayback Machine snapshot URL (e.g. 'https://web.archive.org/web/20230101120000/https://example.com')",
-                    },
-                    "raw": {
-                        "type": "boolean",
-                        "description": "If true, fetch the raw archived content without Wayback Machine toolbar (default: false)",
-                        "default": False,
-                    },
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "url": {
+                    "type": "string",
+                    "description": "The URL to search for (supports wildcards with '*', e.g. 'example.com/*')",
+                },
+                "from_date": {
+                    "type": "string",
+                    "description": "Start date filter in YYYYMMDD format (optional)",
+                },
+                "to_date": {
+                    "type": "string",
+                    "description": "End date filter in YYYYMMDD format (optional)",
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of results to return (default: 10, max: 100)",
+                    "default": 10,
+                },
+                "status_code": {
+                    "type": "string",
+                    "description": "Filter by HTTP status code (e.g. '200', '404'). Optional.",
                 },
-                "required": ["snapshot_url"],
             },
+            "required": ["url"],
+        },
+    ),
+    Tool(
+        name="get_snapshot_content",
+        description=(
+            "Fetch the raw content of a specific Wayback Machine snapshot. "
+            "Returns the page content as text. Use get_latest_snapshot or search_snapshots first to get a snapshot URL."
         ),
-        Tool(
-            name="check_url_availability",
-            description=(
-                "Check whether a URL has been archived in the Wayback Machine at all, "
-                "and how many snapshots are available."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "url": {
-                        "type": "string",
-                        "description": "The URL to check availability for",
-                    }
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "snapshot_url": {
+                    "type": "string",
+                    "description": "The full Wayback Machine snapshot URL (e.g. 'https://web.archive.org/web/20230101120000/https://example.com')",
+                },
+                "raw": {
+                    "type": "boolean",
+                    "description": "If true, fetch the raw archived content without Wayback Machine toolbar (default: false)",
+                    "default": False,
                 },
-                "required": ["url"],
             },
+            "required": ["snapshot_url"],
+        },
+    ),
+    Tool(
+        name="check_url_availability",
+        description=(
+            "Check whether a URL has been archived in the Wayback Machine at all, "
+            "and when it was first and most recently captured."
         ),
-    ]
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "url": {
+                    "type": "string",
+                    "description": "The URL to check availability for",
+                }
+            },
+            "required": ["url"],
+        },
+    ),
+]
+
+
+@app.list_tools()
+async def list_tools() -> list[Tool]:
+    return _TOOLS
 
 
 @app.call_tool()
 async def call_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
+    handler = _HANDLERS.get(name)
+    if handler is None:
+        return CallToolResult(
+            content=[TextContent(type="text", text=f"Unknown tool: {name}")],
+            isError=True,
+        )
     try:
-        if name == "get_latest_snapshot":
-            return await get_latest_snapshot(arguments)
-        elif name == "get_snapshot_at_date":
-            return await get_snapshot_at_date(arguments)
-        elif name == "search_snapshots":
-            return await search_snapshots(arguments)
-        elif name == "get_snapshot_content":
-            return await get_snapshot_content(arguments)
-        elif name == "check_url_availability":
-            return await check_url_availability(arguments)
-        else:
-            return CallToolResult(
-                content=[TextContent(type="text", text=f"Unknown tool: {name}")],
-                isError=True,
-            )
+        return await handler(arguments)
     except Exception as e:
         return CallToolResult(
             content=[TextContent(type="text", text=f"Error: {str(e)}")],
@@ -176,44 +194,79 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
 
 async def get_latest_snapshot(args: dict) -> CallToolResult:
     url = args["url"]
-    async with httpx.AsyncClient(timeout=30) as client:
-        response = await client.get(
-            WAYBACK_AVAILABILITY_API,
-            params={"url": url},
-        )
-        response.raise_for_status()
-        data = response.json()
+
+    # Probe the CDX index for the latest successful capture alongside the
+    # availability lookup, so a miss there can still be answered without another
+    # round-trip. The probe bypasses _CACHE so cancelling it aborts the request.
+    probe_params = {
+        "url": url,
+        "output": "json",
+        "fl": "timestamp,original,statuscode",
+        "filter": "statuscode:200",
+        "limit": -1,
+    }
+    probe_key = ("cdx", frozenset(probe_params.items()))
+    probe_cached, probe_rows = _CACHE.get(probe_key)
+    probe_task = None
+    if not probe_cached:
+        probe_task = asyncio.create_task(_fetch_json(WAYBACK_CDX_API, probe_params))
+
+    try:
+        data = await _get_availability(url)
+    except BaseException:
+        if probe_task is not None:
+            probe_task.cancel()
+        raise
 
     snapshots = data.get("archived_snapshots", {})
     closest = snapshots.get("closest")
 
-    if not closest or not closest.get("available"):
-        return CallToolResult(
-            content=[
-                TextContent(
-                    type="text",
-                    text=json.dumps(
-                        {"available": False, "url": url, "message": "No snapshots found for this URL"},
-                        indent=2,
-                    ),
-                )
-            ]
-        )
+    if closest and closest.get("available"):
+        if probe_task is not None:
+            probe_task.cancel()
+        timestamp = closest["timestamp"]
+        snapshot_url = closest["url"]
+        status = closest.get("status", "unknown")
+    else:
+        rows = probe_rows
+        if probe_task is not None:
+            try:
+                rows = await probe_task
+            except Exception:
+                rows = []
+            else:
+                _CACHE.set(probe_key, rows, NEGATIVE_TTL if _cdx_is_empty(rows) else CDX_TTL)
+
+        if _cdx_is_empty(rows):
+            return CallToolResult(
+                content=[
+                    TextContent(
+                        type="text",
+                        text=orjson.dumps(
+                            {"available": False, "url": url, "message": "No snapshots found for this URL"},
+                            option=orjson.OPT_INDENT_2,
+                        ).decode(),
+                    )
+                ]
+            )
 
-    timestamp = closest["timestamp"]
-    formatted_time = _format_timestamp(timestamp)
+        # First row is headers; with limit=-1 the remaining row is the latest capture
+        latest = dict(zip(rows[0], rows[-1]))
+        timestamp = latest["timestamp"]
+        snapshot_url = f"{WAYBACK_BASE_URL}/{timestamp}/{latest['original']}"
+        status = latest.get("statuscode", "unknown")
 
     result = {
         "available": True,
         "original_url": url,
-        "snapshot_url": closest["url"],
+        "snapshot_url": snapshot_url,
         "timestamp": timestamp,
-        "formatted_time": formatted_time,
-        "status": closest.get("status", "unknown"),
+        "formatted_time": _format_timestamp(timestamp),
+        "status": status,
     }
 
     return CallToolResult(
-        content=[TextContent(type="text", text=json.dumps(result, indent=2))]
+        content=[TextContent(type="text", text=orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())]
     )
 
 
@@ -221,13 +274,7 @@ async def get_snapshot_at_date(args: dict) -> CallToolResult:
     url = args["url"]
     timestamp = args["timestamp"]
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        response = await client.get(
-            WAYBACK_AVAILABILITY_API,
-            params={"url": url, "timestamp": timestamp},
-        )
-        response.raise_for_status()
-        data = response.json()
+    data = await _get_availability(url, timestamp)
 
     snapshots = data.get("archived_snapshots", {})
     closest = snapshots.get("closest")
@@ -237,15 +284,15 @@ async def get_snapshot_at_date(args: dict) -> CallToolResult:
             content=[
                 TextContent(
                     type="text",
-                    text=json.dumps(
+                    text=orjson.dumps(
                         {
                             "available": False,
                             "url": url,
                             "requested_timestamp": timestamp,
                             "message": "No snapshots found near this date",
                         },
-                        indent=2,
-                    ),
+                        option=orjson.OPT_INDENT_2,
+                    ).decode(),
                 )
             ]
         )
@@ -262,7 +309,7 @@ async def get_snapshot_at_date(args: dict) -> CallToolResult:
     }
 
     return CallToolResult(
-        content=[TextContent(type="text", text=json.dumps(result, indent=2))]
+        content=[TextContent(type="text", text=orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())]
     )
 
 
@@ -286,19 +333,16 @@ async def search_snapshots(args: dict) -> CallToolResult:
     if status_code:
         params["filter"] = f"statuscode:{status_code}"
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        response = await client.get(WAYBACK_CDY A_API, params=params)
-        response.raise_for_status()
-        raw = response.json()
+    raw = await _get_cdx(params)
 
     if not raw or len(raw) < 2:
         return CallToolResult(
             content=[
                 TextContent(
                     type="text",
-                    text=json.dumps(
-                        {"url": url, "total_found": 0, "snapshots": []}, indent=2
-                    ),
+                    text=orjson.dumps(
+                        {"url": url, "total_found": 0, "snapshots": []}, option=orjson.OPT_INDENT_2
+                    ).decode(),
                 )
             ]
         )
@@ -307,53 +351,60 @@ async def search_snapshots(args: dict) -> CallToolResult:
     headers = raw[0]
     rows = raw[1:]
 
-    snapshots = []
-    for row in rows:
-        entry = dict(zip(headers, row))
-        ts = entry.get("timestamp", "")
-        snapshots.append(
-            {
-                "timestamp": ts,
-                "formatted_time": _format_timestamp(ts),
-                "snapshot_url": f"{WAYBACK_BASE_URL}/{ts}/{entry.get('original', '')}",
-                "original_url": entry.get("original", ""),
-                "status_code": entry.get("statuscode", ""),
-                "mime_type": entry.get("mimetype", ""),
-                "size_bytes": entry.get("length", ""),
-            }
-        )
-
-    result = {
-        "url": url,
-        "total_found": len(snapshots),
-        "snapshots": snapshots,
+    # Resolve column positions once; header order is fixed per response
+    ts_i = headers.index("timestamp")
+    orig_i = headers.index("original")
+    sc_i = headers.index("statuscode")
+    mt_i = headers.index("mimetype")
+    len_i = headers.index("length")
+
+    text = orjson.dumps(
+        {
+            "url": url,
+            "total_found": len(rows),
+            "snapshots": [_row_to_dict(row, ts_i, orig_i, sc_i, mt_i, len_i) for row in rows],
+        },
+        option=orjson.OPT_INDENT_2,
+    ).decode()
+
+    return CallToolResult(content=[TextContent(type="text", text=text)])
+
+
+def _row_to_dict(row: list, ts_i: int, orig_i: int, sc_i: int, mt_i: int, len_i: int) -> dict:
+    """Convert one CDX row into a snapshot entry using precomputed column indices."""
+    ts = row[ts_i]
+    original = row[orig_i]
+    return {
+        "timestamp": ts,
+        "formatted_time": _format_timestamp(ts),
+        "snapshot_url": f"{WAYBACK_BASE_URL}/{ts}/{original}",
+        "original_url": original,
+        "status_code": row[sc_i],
+        "mime_type": row[mt_i],
+        "size_bytes": row[len_i],
     }
 
-    return CallToolResult(
-        content=[TextContent(type="text", text=json.dumps(result, indent=2))]
-    )
-
 
 async def get_snapshot_content(args: dict) -> CallToolResult:
     snapshot_url = args["snapshot_url"]
     raw = args.get("raw", False)
 
     # For raw mode, insert 'id_' flag into the Wayback URL
-    if raw and "/web/" in snapshot_url:
-        parts = snapshot_url.split("/web/", 1)
-        ts_and_url = parts[1].split("/", 1)
-        if len(ts_and_url) == 2:
-            snapshot_url = f"{parts[0]}/web/{ts_and_url[0]}id_/{ts_and_url[1]}"
-
-    async with httpx.AsyncClient(
-        timeout=60, follow_redirects=True, headers={"User-Agent": "wayback-machine-mcp/1.0"}
-    ) as client:
-        response = await client.get(snapshot_url)
-        response.raise_for_status()
-        content = response.text
+    if raw:
+        snapshot_url = _WEB_TS_RE.sub(r"\1\2id_/", snapshot_url, count=1)
+
+    # Stop reading once we have enough bytes to fill MAX_CHARS
+    buf = bytearray()
+    async with _RATE_LIMIT:
+        async with _CLIENT.stream("GET", snapshot_url, timeout=60, follow_redirects=True) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(chunk_size=16384):
+                buf += chunk
+                if len(buf) > MAX_BYTES:
+                    break
+            content = bytes(buf).decode(response.encoding or "utf-8", errors="replace")
 
     # Truncate if too large
-    MAX_CHARS = 50_000
     truncated = len(content) > MAX_CHARS
     if truncated:
         content = content[:MAX_CHARS]
@@ -366,33 +417,22 @@ async def get_snapshot_content(args: dict) -> CallToolResult:
     }
 
     return CallToolResult(
-        content=[TextContent(type="text", text=json.dumps(result, indent=2))]
+        content=[TextContent(type="text", text=orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())]
     )
 
 
 async def check_url_availability(args: dict) -> CallToolResult:
     url = args["url"]
 
-    # Use CDX to count total snapshots
-    async with httpx.AsyncClient(timeout=30) as client:
-        # Get count
-        count_response = await client.get(
-            WAYBACK_CDX_API,
-            params={"url": url, "output": "json", "fl": "timestamp", "limit": 1, "showNumPages": "true"},
-        )
-
-        # Get first and last snapshots
-        first_response = await client.get(
-            WAYBACK_CDX_API,
-            params={"url": url, "output": "json", "fl": "timestamp,statuscode", "limit": 1},
-        )
-        last_response = await client.get(
-            WAYBACK_CDX_API,
-            params={"url": url, "output": "json", "fl": "timestamp,statuscode", "limit": 1, "fastLatest": "true"},
-        )
-
-    first_data = first_response.json() if first_response.status_code == 200 else []
-    last_data = last_response.json() if last_response.status_code == 200 else []
+    # First and last lookups are independent, so run them concurrently.
+    # The query strings are fixed apart from the URL, so encode it only once.
+    q = quote_plus(url)
+    results = await asyncio.gather(
+        _get_cdx_url(f"{WAYBACK_CDX_API}?url={q}&output=json&fl=timestamp,statuscode&limit=1"),
+        _get_cdx_url(f"{WAYBACK_CDX_API}?url={q}&output=json&fl=timestamp,statuscode&limit=1&fastLatest=true"),
+        return_exceptions=True,
+    )
+    first_data, last_data = _lookup_rows(results)
 
     first_snapshot = None
     last_snapshot = None
@@ -414,23 +454,208 @@ async def check_url_availability(args: dict) -> CallToolResult:
     }
 
     return CallToolResult(
-        content=[TextContent(type="text", text=json.dumps(result, indent=2))]
+        content=[TextContent(type="text", text=orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())]
     )
 
 
+_HANDLERS: dict[str, Callable[[dict], Awaitable[CallToolResult]]] = {
+    "get_latest_snapshot": get_latest_snapshot,
+    "get_snapshot_at_date": get_snapshot_at_date,
+    "search_snapshots": search_snapshots,
+    "get_snapshot_content": get_snapshot_content,
+    "check_url_availability": check_url_availability,
+}
+
+
+class _Cache:
+    """Bounded LRU cache with per-entry expiry and single-flight loading."""
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float,
+        negative_ttl: float,
+        is_negative: Callable[[Any], bool],
+    ) -> Any:
+        """Return the cached value for key, calling loader at most once per miss.
+
+        Concurrent callers for the same key share a single upstream request.
+        Values for which is_negative() is true are kept for negative_ttl.
+        Errors are propagated and never cached.
+        """
+        hit, value = self.get(key)
+        if hit:
+            return value
+
+        # The load runs in its own task, so every waiter is resolved from it and a
+        # cancelled caller does not abort the request for the others
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(loader())
+            self._inflight[key] = task
+            task.add_done_callback(
+                functools.partial(self._on_loaded, key, ttl, negative_ttl, is_negative)
+            )
+        return await asyncio.shield(task)
+
+    def _on_loaded(
+        self,
+        key: Hashable,
+        ttl: float,
+        negative_ttl: float,
+        is_negative: Callable[[Any], bool],
+        task: asyncio.Task,
+    ) -> None:
+        del self._inflight[key]
+        # Calling exception() also stops a failure no caller awaited from being logged
+        if task.cancelled() or task.exception() is not None:
+            return
+        value = task.result()
+        self.set(key, value, negative_ttl if is_negative(value) else ttl)
+
+
+_CACHE = _Cache()
+
+
+async def _fetch_json(url: str, params: dict | None = None) -> Any:
+    """GET url and parse the body with orjson, regardless of Content-Type."""
+    async with _RATE_LIMIT:
+        response = await _CLIENT.get(url, params=params)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
+async def _get_availability(url: str, timestamp: str | None = None) -> dict:
+    """Query the availability API, caching results by (url, timestamp)."""
+    params = {"url": url}
+    if timestamp is not None:
+        params["timestamp"] = timestamp
+    return await _CACHE.get_or_load(
+        ("avail", url, timestamp),
+        lambda: _fetch_json(WAYBACK_AVAILABILITY_API, params),
+        AVAILABILITY_TTL,
+        NEGATIVE_TTL,
+        _availability_is_empty,
+    )
+
+
+async def _get_cdx(params: dict) -> list:
+    """Query the CDX API, caching results by the full parameter set."""
+    return await _CACHE.get_or_load(
+        ("cdx", frozenset(params.items())),
+        lambda: _fetch_json(WAYBACK_CDX_API, params),
+        CDX_TTL,
+        NEGATIVE_TTL,
+        _cdx_is_empty,
+    )
+
+
+async def _get_cdx_url(full_url: str) -> list:
+    """Query the CDX API with a pre-encoded URL, caching results by that URL."""
+    return await _CACHE.get_or_load(
+        ("cdx", full_url),
+        lambda: _fetch_json(full_url),
+        CDX_TTL,
+        NEGATIVE_TTL,
+        _cdx_is_empty,
+    )
+
+
+def _lookup_rows(results: list) -> list:
+    """Turn gathered CDX lookups into row lists.
+
+    A 4xx response counts as no rows. Any other failure, or every lookup
+    failing, is raised so that call_tool reports an error.
+    """
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors and len(errors) == len(results):
+        raise errors[0]
+    for error in errors:
+        if not (isinstance(error, httpx.HTTPStatusError) and error.response.is_client_error):
+            raise error
+    return [[] if isinstance(r, BaseException) else r for r in results]
+
+
+def _availability_is_empty(data: Any) -> bool:
+    if not isinstance(data, dict):
+        return True
+    closest = (data.get("archived_snapshots") or {}).get("closest") or {}
+    return not closest.get("available")
+
+
+def _cdx_is_empty(rows: Any) -> bool:
+    # The first row is the header, so a hit needs at least two rows. Some CDX
+    # queries (e.g. showNumPages) return a bare number instead of rows.
+    return not isinstance(rows, list) or len(rows) < 2
+
+
+@functools.lru_cache(maxsize=4096)
 def _format_timestamp(ts: str) -> str:
-    """Convert YYYYMMDDthmmss to a readable datetime string."""
+    """Convert YYYYMMDDhhmmss to a readable datetime string.
+
+    Partial timestamps are zero-padded; invalid ones are returned unchanged.
+    """
     try:
-        ts = ts.ljust(14, "0")
-        dt = datetime.strptime(ts[:14], "%Y%m%d%H%M%S")
-        return dt.strftime("%Y-%m-%d %H:%M:%S UTC")
-    except Exception:
+        padded = ts.ljust(14, "0")
+        digits = padded[:14]
+        if not (digits.isascii() and digits.isdigit()):
+            return ts
+        year, month, day = int(digits[0:4]), int(digits[4:6]), int(digits[6:8])
+        if (
+            year < 1
+            or not 1 <= month <= 12
+            or not 1 <= day <= calendar.monthrange(year, month)[1]
+            or int(digits[8:10]) > 23
+            or int(digits[10:12]) > 59
+            or int(digits[12:14]) > 59
+        ):
+            return ts
+        return f"{digits[0:4]}-{digits[4:6]}-{digits[6:8]} {digits[8:10]}:{digits[10:12]}:{digits[12:14]} UTC"
+    except (AttributeError, TypeError, ValueError):
         return ts
 
 
 async def main():
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(read_stream, write_stream, app.create_initialization_options())
+    # Imported here so that importing this module does not load the stdio transport
+    from mcp.server.stdio import stdio_server
+
+    global _CLIENT
+    _CLIENT = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        timeout=httpx.Timeout(30.0, connect=5.0),
+        # aiter_bytes() yields decoded bytes, so MAX_BYTES applies to the decompressed size
+        headers={"User-Agent": "wayback-machine-mcp/1.0", "Accept-Encoding": "br, gzip, deflate"},
+    )
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(read_stream, write_stream, app.create_initialization_options())
+    finally:
+        await _CLIENT.aclose()
+        _CLIENT = None
 
 
 if __name__ == "__main__":
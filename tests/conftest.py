@@ -0,0 +1,29 @@
+import asyncio
+
+import httpx
+import pytest
+
+import server
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(server, "_CACHE", server._Cache())
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limit(monkeypatch):
+    # Each test runs its own event loop, so don't share a semaphore bound to an old one
+    monkeypatch.setattr(server, "_RATE_LIMIT", asyncio.Semaphore(server.MAX_CONCURRENT_REQUESTS))
+
+
+@pytest.fixture
+def mock_client(monkeypatch):
+    """Route the shared client through an httpx.MockTransport handler."""
+
+    def install(handler):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(server, "_CLIENT", client)
+        return client
+
+    return install
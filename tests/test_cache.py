@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_callers_share_one_load():
+    cache = server._Cache()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return [["timestamp"], ["20230101000000"]]
+
+    async def main():
+        return await asyncio.gather(
+            *[cache.get_or_load("k", loader, 60, 1, server._cdx_is_empty) for _ in range(5)]
+        )
+
+    results = _run(main())
+    assert calls == 1
+    assert all(r == [["timestamp"], ["20230101000000"]] for r in results)
+    assert cache.get("k") == (True, [["timestamp"], ["20230101000000"]])
+
+
+def test_non_list_cdx_result_resolves_all_waiters():
+    # showNumPages=true returns a bare number rather than rows
+    cache = server._Cache()
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        return 3
+
+    async def main():
+        return await asyncio.wait_for(
+            asyncio.gather(*[cache.get_or_load("k", loader, 60, 1, server._cdx_is_empty) for _ in range(2)]),
+            timeout=1,
+        )
+
+    assert _run(main()) == [3, 3]
+    assert cache.get("k") == (True, 3)
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    cache = server._Cache()
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            *[cache.get_or_load("k", loader, 60, 1, server._cdx_is_empty) for _ in range(2)],
+            return_exceptions=True,
+        )
+
+    results = _run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.get("k") == (False, None)
+
+
+def test_cancelled_caller_does_not_cancel_other_waiters():
+    cache = server._Cache()
+
+    async def loader():
+        await asyncio.sleep(0.02)
+        return [["timestamp"], ["20230101000000"]]
+
+    async def main():
+        first = asyncio.create_task(cache.get_or_load("k", loader, 60, 1, server._cdx_is_empty))
+        second = asyncio.create_task(cache.get_or_load("k", loader, 60, 1, server._cdx_is_empty))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert _run(main()) == [["timestamp"], ["20230101000000"]]
+
+
+def test_expired_entries_are_dropped():
+    cache = server._Cache()
+    cache.set("k", "v", -1)
+    assert cache.get("k") == (False, None)
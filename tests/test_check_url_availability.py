@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import httpx
+
+import server
+
+ROWS = [["timestamp", "statuscode"], ["20230101120000", "200"]]
+
+
+def _call(args):
+    return asyncio.run(server.call_tool("check_url_availability", args))
+
+
+def test_reports_first_and_latest_snapshots(mock_client):
+    mock_client(lambda request: httpx.Response(200, json=ROWS))
+
+    result = _call({"url": "example.com"})
+
+    assert not result.isError
+    data = json.loads(result.content[0].text)
+    assert data["is_archived"] is True
+    assert data["first_snapshot"]["timestamp"] == "20230101120000"
+    assert data["latest_snapshot"]["formatted_time"] == "2023-01-01 12:00:00 UTC"
+
+
+def test_client_error_on_one_lookup_counts_as_no_rows(mock_client):
+    def handler(request):
+        if "fastLatest" in str(request.url):
+            return httpx.Response(404)
+        return httpx.Response(200, json=ROWS)
+
+    mock_client(handler)
+
+    result = _call({"url": "example.com"})
+
+    assert not result.isError
+    data = json.loads(result.content[0].text)
+    assert data["is_archived"] is True
+    assert data["latest_snapshot"] is None
+
+
+def test_connection_error_is_reported(mock_client):
+    def handler(request):
+        raise httpx.ConnectError("archive.org unreachable", request=request)
+
+    mock_client(handler)
+
+    result = _call({"url": "example.com"})
+
+    assert result.isError
+    assert "archive.org unreachable" in result.content[0].text
+
+
+def test_server_error_is_reported(mock_client):
+    def handler(request):
+        if "fastLatest" in str(request.url):
+            return httpx.Response(503)
+        return httpx.Response(200, json=ROWS)
+
+    mock_client(handler)
+
+    assert _call({"url": "example.com"}).isError
+
+
+def test_both_lookups_failing_is_reported(mock_client):
+    mock_client(lambda request: httpx.Response(404))
+
+    assert _call({"url": "example.com"}).isError
+
+
+def test_url_is_encoded_into_the_query(mock_client):
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.params["url"])
+        return httpx.Response(200, json=ROWS)
+
+    mock_client(handler)
+
+    assert not _call({"url": "example.com/?a=1&b=2"}).isError
+    assert seen == ["example.com/?a=1&b=2", "example.com/?a=1&b=2"]
@@ -0,0 +1,23 @@
+import pytest
+
+import server
+
+
+@pytest.mark.parametrize(
+    "ts, expected",
+    [
+        ("20230101120000", "2023-01-01 12:00:00 UTC"),
+        ("20230131235959", "2023-01-31 23:59:59 UTC"),
+        ("20240229", "2024-02-29 00:00:00 UTC"),
+    ],
+)
+def test_formats_valid_timestamps(ts, expected):
+    assert server._format_timestamp(ts) == expected
+
+
+@pytest.mark.parametrize(
+    "ts",
+    ["", "abc", "2023", "20231345", "20230229", "00000101", "20230101240000", "2023010112000\u00b2", None],
+)
+def test_returns_invalid_timestamps_unchanged(ts):
+    assert server._format_timestamp(ts) == ts
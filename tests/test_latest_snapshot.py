@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import httpx
+
+import server
+
+HIT = {
+    "archived_snapshots": {
+        "closest": {
+            "available": True,
+            "url": "https://web.archive.org/web/20230101120000/https://example.com/",
+            "timestamp": "20230101120000",
+            "status": "200",
+        }
+    }
+}
+MISS = {"archived_snapshots": {}}
+CDX_ROWS = [["timestamp", "original", "statuscode"], ["20240101000000", "https://example.com/", "200"]]
+
+
+def _call(args):
+    result = asyncio.run(server.call_tool("get_latest_snapshot", args))
+    assert not result.isError, result.content[0].text
+    return json.loads(result.content[0].text)
+
+
+def _handler(availability, cdx, cdx_requests, cdx_delay=0.0):
+    async def handler(request):
+        if request.url.path == "/wayback/available":
+            return httpx.Response(200, json=availability)
+        cdx_requests.append(request)
+        await asyncio.sleep(cdx_delay)
+        return cdx(request)
+
+    return handler
+
+
+def test_availability_hit_cancels_the_probe(mock_client):
+    started, completed = [], []
+
+    def cdx(request):
+        completed.append(request)
+        return httpx.Response(200, json=CDX_ROWS)
+
+    mock_client(_handler(HIT, cdx, started, cdx_delay=0.05))
+
+    async def main():
+        result = await server.call_tool("get_latest_snapshot", {"url": "example.com"})
+        # Give a probe that was not really cancelled time to finish
+        await asyncio.sleep(0.1)
+        return json.loads(result.content[0].text)
+
+    data = asyncio.run(main())
+
+    assert data["snapshot_url"] == HIT["archived_snapshots"]["closest"]["url"]
+    assert data["timestamp"] == "20230101120000"
+    assert len(started) == 1
+    assert completed == []
+
+
+def test_availability_miss_falls_back_to_cdx(mock_client):
+    requests = []
+    mock_client(_handler(MISS, lambda request: httpx.Response(200, json=CDX_ROWS), requests))
+
+    data = _call({"url": "example.com"})
+
+    assert data["available"] is True
+    assert data["snapshot_url"] == f"{server.WAYBACK_BASE_URL}/20240101000000/https://example.com/"
+    assert data["status"] == "200"
+    assert requests[0].url.params["filter"] == "statuscode:200"
+
+
+def test_probe_failure_reports_no_snapshots(mock_client):
+    requests = []
+    mock_client(_handler(MISS, lambda request: httpx.Response(503), requests))
+
+    data = _call({"url": "example.com"})
+
+    assert data == {"available": False, "url": "example.com", "message": "No snapshots found for this URL"}
+
+
+def test_cached_probe_is_reused(mock_client):
+    requests = []
+    mock_client(_handler(MISS, lambda request: httpx.Response(200, json=CDX_ROWS), requests))
+
+    first = _call({"url": "example.com"})
+    second = _call({"url": "example.com"})
+
+    assert first == second
+    assert len(requests) == 1
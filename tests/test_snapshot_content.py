@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import server
+
+SNAPSHOT_URL = "https://web.archive.org/web/20230101120000/https://example.com/"
+
+
+def _call(args):
+    result = asyncio.run(server.call_tool("get_snapshot_content", args))
+    assert not result.isError, result.content[0].text
+    return json.loads(result.content[0].text)
+
+
+def test_large_multibyte_body_is_truncated_after_max_bytes(mock_client):
+    # Three UTF-8 bytes per character, so MAX_BYTES ends mid-character
+    body = ("€" * 100_000).encode("utf-8")
+    sent = 0
+
+    async def stream():
+        nonlocal sent
+        for i in range(0, len(body), 4096):
+            sent += 4096
+            yield body[i : i + 4096]
+
+    mock_client(
+        lambda request: httpx.Response(
+            200, headers={"content-type": "text/html; charset=utf-8"}, content=stream()
+        )
+    )
+
+    data = _call({"snapshot_url": SNAPSHOT_URL})
+
+    assert data["truncated"] is True
+    assert data["content_length"] == server.MAX_CHARS
+    assert data["content"] == "€" * server.MAX_CHARS
+    assert sent < len(body)
+
+
+def test_short_body_is_returned_whole(mock_client):
+    mock_client(
+        lambda request: httpx.Response(
+            200, headers={"content-type": "text/html; charset=utf-8"}, content="<p>héllo</p>".encode("utf-8")
+        )
+    )
+
+    data = _call({"snapshot_url": SNAPSHOT_URL})
+
+    assert data["truncated"] is False
+    assert data["content"] == "<p>héllo</p>"
+    assert data["content_length"] == len("<p>héllo</p>")
+
+
+@pytest.mark.parametrize(
+    "snapshot_url, expected",
+    [
+        (SNAPSHOT_URL, "https://web.archive.org/web/20230101120000id_/https://example.com/"),
+        (
+            "https://web.archive.org/web/2023*/https://ex.com/web/123/x",
+            "https://web.archive.org/web/2023*/https://ex.com/web/123/x",
+        ),
+        (
+            "https://web.archive.org/web/20230101im_/https://ex.com/web/5/",
+            "https://web.archive.org/web/20230101im_/https://ex.com/web/5/",
+        ),
+        (
+            "https://web.archive.org/web/20230101120000id_/https://ex.com/",
+            "https://web.archive.org/web/20230101120000id_/https://ex.com/",
+        ),
+    ],
+)
+def test_raw_mode_only_rewrites_the_wayback_timestamp(mock_client, snapshot_url, expected):
+    mock_client(lambda request: httpx.Response(200, content=b"ok"))
+
+    data = _call({"snapshot_url": snapshot_url, "raw": True})
+
+    assert data["snapshot_url"] == expected